@@ -7,26 +7,65 @@ Publishes dbt manifest.json to S3 registry with:
 - history/ partition: Timestamped audit trail
 
 Usage:
-    python publish_manifest.py [--local] [--bucket BUCKET] [--env ENV]
+    python publish_manifest.py [--local] [--bucket BUCKET] [--env ENV] [--gzip]
 
 For local testing (no S3):
     python publish_manifest.py --local
 """
 
 import argparse
-import json
+import errno
+import gzip
+import hashlib
 import os
 import shutil
+import tempfile
 from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
 
 # Optional boto3 import for S3 mode
 try:
     import boto3
+    from boto3.s3.transfer import TransferConfig
+    from botocore.config import Config
+    from botocore.exceptions import ClientError
     HAS_BOTO3 = True
 except ImportError:
     HAS_BOTO3 = False
 
+# Optional orjson import for faster manifest parsing (stdlib json fallback)
+try:
+    import orjson as _json
+except ImportError:
+    import json as _json
+
+# Optional ijson import for streaming manifest validation
+try:
+    import ijson
+    HAS_IJSON = True
+except ImportError:
+    HAS_IJSON = False
+
+# Multipart settings for large manifests (parts are uploaded/copied in parallel)
+S3_TRANSFER_CONFIG = TransferConfig(
+    multipart_threshold=16 * 1024 ** 2,
+    multipart_chunksize=16 * 1024 ** 2,
+    max_concurrency=10,
+    use_threads=True,
+) if HAS_BOTO3 else None
+
+
+@lru_cache(maxsize=None)
+def get_s3_client():
+    """Shared S3 client: pooled keep-alive connections reused across uploads, adaptive retries"""
+    return boto3.client('s3', config=Config(
+        retries={'mode': 'adaptive', 'max_attempts': 10},
+        max_pool_connections=32,
+        tcp_keepalive=True,
+        s3={'addressing_style': 'virtual'},
+    ))
+
 
 def get_manifest_path() -> Path:
     """Get path to compiled manifest.json"""
@@ -39,7 +78,58 @@ def get_manifest_path() -> Path:
     return manifest_path
 
 
-def publish_local(manifest_path: Path, project_name: str, env: str, registry_base: Path):
+def find_public_models(manifest_path: Path) -> list:
+    """List public model node ids, streaming the manifest's nodes when ijson is available"""
+    with open(manifest_path, 'rb') as f:
+        if HAS_IJSON:
+            nodes = ijson.kvitems(f, "nodes")
+        else:
+            nodes = _json.loads(f.read()).get("nodes", {}).items()
+
+        return [
+            node_id for node_id, node in nodes
+            if node.get("resource_type") == "model" and node.get("access") == "public"
+        ]
+
+
+def _fastcopy(src: Path, dst: Path, buffer_size: int = 1024 * 1024):
+    """Copy src to dst with copy_file_range (zero-copy/reflink where supported), else a 1 MiB buffered copy"""
+    with open(src, 'rb') as fsrc, open(dst, 'wb') as fdst:
+        if hasattr(os, "copy_file_range"):
+            remaining = os.fstat(fsrc.fileno()).st_size
+            try:
+                while remaining > 0:
+                    copied = os.copy_file_range(fsrc.fileno(), fdst.fileno(), remaining)
+                    if copied == 0:
+                        break
+                    remaining -= copied
+                if remaining == 0:
+                    return
+            except OSError:
+                pass
+            # Resume from wherever copy_file_range stopped
+            fsrc.seek(os.lseek(fsrc.fileno(), 0, os.SEEK_CUR))
+            fdst.seek(os.lseek(fdst.fileno(), 0, os.SEEK_CUR))
+        shutil.copyfileobj(fsrc, fdst, length=buffer_size)
+
+
+def _sha256_file(path: Path, buffer_size: int = 1024 * 1024) -> str:
+    """Hex SHA-256 of a file, read in 1 MiB chunks"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(buffer_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _gzip_copy(src: Path, dst: Path, compresslevel: int = 6, buffer_size: int = 1024 * 1024):
+    """Stream src into a gzip-compressed dst"""
+    with open(src, 'rb') as fsrc, gzip.open(dst, 'wb', compresslevel=compresslevel) as fdst:
+        shutil.copyfileobj(fsrc, fdst, length=buffer_size)
+
+
+def publish_local(manifest_path: Path, project_name: str, env: str, registry_base: Path,
+                  compress: bool = False):
     """Publish manifest to local filesystem (S3 simulation)"""
     timestamp = datetime.utcnow().strftime("%Y%m%dT%H%M%SZ")
 
@@ -52,11 +142,35 @@ def publish_local(manifest_path: Path, project_name: str, env: str, registry_bas
     history_dir.mkdir(parents=True, exist_ok=True)
 
     # Copy manifest to both locations
-    latest_path = latest_dir / "manifest.json"
-    history_path = history_dir / "manifest.json"
-
-    shutil.copy2(manifest_path, latest_path)
-    shutil.copy2(manifest_path, history_path)
+    filename = "manifest.json.gz" if compress else "manifest.json"
+    latest_path = latest_dir / filename
+    history_path = history_dir / filename
+
+    # Write the source once to a temp file in latest/, hardlink history/ to it,
+    # then atomically rename it over latest/ so readers never see a partial file.
+    # Nothing is linked to target/manifest.json, which dbt rewrites in place.
+    # Both destinations are only ever replaced, never opened for writing: a
+    # same-second republish may find history_path already linked to latest/.
+    tmp_path = latest_dir / f".{filename}.{os.getpid()}.tmp"
+    history_tmp_path = history_dir / f".{filename}.{os.getpid()}.tmp"
+    try:
+        if compress:
+            _gzip_copy(manifest_path, tmp_path)
+        else:
+            _fastcopy(manifest_path, tmp_path)
+        history_tmp_path.unlink(missing_ok=True)
+        try:
+            os.link(tmp_path, history_tmp_path)
+        except OSError as e:
+            if e.errno not in (errno.EXDEV, errno.EPERM, errno.EMLINK, errno.ENOTSUP):
+                raise
+            # Cross-device or no hardlink support
+            _fastcopy(tmp_path, history_tmp_path)
+        os.replace(history_tmp_path, history_path)
+        os.replace(tmp_path, latest_path)
+    finally:
+        tmp_path.unlink(missing_ok=True)
+        history_tmp_path.unlink(missing_ok=True)
 
     print(f"✓ Published to local registry:")
     print(f"  Latest:  {latest_path}")
@@ -65,36 +179,64 @@ def publish_local(manifest_path: Path, project_name: str, env: str, registry_bas
     return str(latest_path), str(history_path)
 
 
-def publish_s3(manifest_path: Path, project_name: str, env: str, bucket: str):
+def publish_s3(manifest_path: Path, project_name: str, env: str, bucket: str, compress: bool = False):
     """Publish manifest to S3 registry"""
     if not HAS_BOTO3:
         raise ImportError("boto3 required for S3 publishing. Install with: pip install boto3")
 
     timestamp = datetime.utcnow().strftime("%Y%m%dT%H%M%SZ")
 
-    s3_client = boto3.client('s3')
+    s3_client = get_s3_client()
 
     # Define S3 keys
-    latest_key = f"registry/{project_name}/{env}/latest/manifest.json"
-    history_key = f"registry/{project_name}/{env}/history/{timestamp}/manifest.json"
-
-    # Read manifest content
-    with open(manifest_path, 'r') as f:
-        manifest_content = f.read()
-
-    # Upload to both locations
-    s3_client.put_object(
-        Bucket=bucket,
-        Key=latest_key,
-        Body=manifest_content,
-        ContentType='application/json'
-    )
+    filename = "manifest.json.gz" if compress else "manifest.json"
+    latest_key = f"registry/{project_name}/{env}/latest/{filename}"
+    history_key = f"registry/{project_name}/{env}/history/{timestamp}/{filename}"
+
+    # Skip the publish when latest/ already holds this exact manifest
+    content_hash = _sha256_file(manifest_path)
+    try:
+        head = s3_client.head_object(Bucket=bucket, Key=latest_key)
+    except ClientError as e:
+        error_code = e.response.get('Error', {}).get('Code')
+        # Missing keys return 403 instead of 404 without s3:ListBucket; treat both as a miss
+        if error_code in ('403', 'AccessDenied', 'Forbidden'):
+            print(f"⚠ Could not HEAD s3://{bucket}/{latest_key} ({error_code}), publishing without change check")
+        elif error_code not in ('404', 'NoSuchKey', 'NotFound'):
+            raise
+    else:
+        if head.get('Metadata', {}).get('content-hash') == content_hash:
+            print(f"✓ Manifest unchanged (sha256 {content_hash[:12]}), skipping upload:")
+            print(f"  Latest:  s3://{bucket}/{latest_key}")
+            print(f"  History: not written (no new snapshot for an unchanged manifest)")
+            return f"s3://{bucket}/{latest_key}", None
+
+    extra_args = {'ContentType': 'application/json', 'Metadata': {'content-hash': content_hash}}
+    if compress:
+        extra_args['ContentEncoding'] = 'gzip'
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        upload_path = manifest_path
+        if compress:
+            upload_path = Path(tmp_dir) / filename
+            _gzip_copy(manifest_path, upload_path)
+
+        # Upload once to latest/ (streamed from disk, multipart for large manifests)
+        s3_client.upload_file(
+            str(upload_path),
+            bucket,
+            latest_key,
+            ExtraArgs=extra_args,
+            Config=S3_TRANSFER_CONFIG
+        )
 
-    s3_client.put_object(
-        Bucket=bucket,
-        Key=history_key,
-        Body=manifest_content,
-        ContentType='application/json'
+    # Server-side copy latest/ -> history/ (no second body transfer from the client)
+    s3_client.copy(
+        {'Bucket': bucket, 'Key': latest_key},
+        bucket,
+        history_key,
+        ExtraArgs={**extra_args, 'MetadataDirective': 'REPLACE'},
+        Config=S3_TRANSFER_CONFIG
     )
 
     print(f"✓ Published to S3 registry:")
@@ -111,6 +253,8 @@ def main():
     parser.add_argument("--env", default="prod", help="Environment (dev/staging/prod)")
     parser.add_argument("--project", default="dbt_up", help="Project name for registry path")
     parser.add_argument("--registry-path", default="../registry", help="Local registry base path")
+    parser.add_argument("--gzip", action="store_true",
+                        help="Publish gzip-compressed manifest.json.gz instead of manifest.json")
 
     args = parser.parse_args()
 
@@ -119,13 +263,7 @@ def main():
     print(f"Found manifest: {manifest_path}")
 
     # Validate manifest has public models
-    with open(manifest_path) as f:
-        manifest = json.load(f)
-
-    public_models = [
-        node_id for node_id, node in manifest.get("nodes", {}).items()
-        if node.get("resource_type") == "model" and node.get("access") == "public"
-    ]
+    public_models = find_public_models(manifest_path)
 
     if not public_models:
         print("⚠ Warning: No public models found in manifest")
@@ -135,11 +273,11 @@ def main():
     # Publish
     if args.local:
         registry_base = Path(__file__).parent / args.registry_path
-        publish_local(manifest_path, args.project, args.env, registry_base)
+        publish_local(manifest_path, args.project, args.env, registry_base, compress=args.gzip)
     else:
         if not args.bucket:
             raise ValueError("S3 bucket required. Set --bucket or DBT_MESH_BUCKET env var")
-        publish_s3(manifest_path, args.project, args.env, args.bucket)
+        publish_s3(manifest_path, args.project, args.env, args.bucket, compress=args.gzip)
 
     print("\n✓ Manifest published successfully!")
 
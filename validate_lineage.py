@@ -24,67 +24,98 @@ Examples:
 """
 
 import argparse
-import json
+import io
+import mmap
+import re
 import sys
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stdout
+from functools import lru_cache
+from itertools import chain
 from pathlib import Path
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
 
+# Optional orjson import for faster manifest parsing (stdlib json fallback)
+try:
+    import orjson as _json
+except ImportError:
+    import json as _json  # type: ignore[no-redef]
 
-def load_manifest(manifest_path: Path) -> dict:
-    """Load and parse a dbt manifest.json file"""
+
+def load_manifest(manifest_path: Path, upstream_project: Optional[str] = None) -> Optional[dict]:
+    """
+    Load and parse a dbt manifest.json file.
+
+    If upstream_project is given, the raw bytes are scanned for it first and
+    None is returned without parsing when the manifest cannot reference it.
+    """
     if not manifest_path.exists():
         raise FileNotFoundError(f"Manifest not found: {manifest_path}")
 
-    with open(manifest_path) as f:
-        return json.load(f)
+    with open(manifest_path, 'rb') as f:
+        if upstream_project and manifest_path.stat().st_size > 0:
+            # Every upstream ref (model.dbt_up.* / source.*.dbt_up.*) contains ".dbt_up."
+            needle = f".{upstream_project}.".encode()
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                if mm.find(needle) == -1:
+                    return None
+        return _json.loads(f.read())
 
 
-def find_cross_project_refs(manifest: dict, upstream_project: str = "dbt_up") -> Dict[str, List[str]]:
+@lru_cache(maxsize=None)
+def upstream_ref_pattern(upstream_project: str) -> "re.Pattern[str]":
     """
-    Find all cross-project references in the manifest's parent_map.
+    Compile the matcher for refs pointing at the upstream project.
 
-    Returns dict mapping downstream model -> list of upstream parent refs
-    Checks for both model refs (dbt-loom) and source refs (native approach)
+    dbt-loom: model.dbt_up.public_orders
+    Native sources: source.{current_project}.dbt_up.public_orders
     """
-    parent_map = manifest.get("parent_map", {})
-    cross_refs = {}
-
-    for node_id, parents in parent_map.items():
-        # Look for upstream project references in parents
-        # dbt-loom: model.dbt_up.public_orders
-        # Native sources: source.{current_project}.dbt_up.public_orders
-        upstream_parents = [
-            parent for parent in parents
-            if (parent.startswith(f"model.{upstream_project}.") or
-                f".{upstream_project}." in parent and parent.startswith("source."))
-        ]
-
-        if upstream_parents:
-            cross_refs[node_id] = upstream_parents
+    project = re.escape(upstream_project)
+    return re.compile(rf"model\.{project}\.|source\.(?:.*\.)?{project}\.")
 
-    return cross_refs
 
-
-def find_cross_project_refs_in_nodes(manifest: dict, upstream_project: str = "dbt_up") -> Dict[str, List[str]]:
+def find_cross_project_refs(
+    manifest: dict, upstream_project: str = "dbt_up"
+) -> Tuple[Dict[str, List[str]], Dict[str, List[str]]]:
     """
-    Alternative check: Look for refs in node depends_on.
+    Find all cross-project references in a single pass over the manifest.
+
+    Returns (parent_refs, node_refs), each mapping downstream node -> list of
+    upstream refs, found in parent_map and in nodes' depends_on respectively.
     Checks for both model refs (dbt-loom) and source refs (native approach)
     """
+    parent_map = manifest.get("parent_map", {})
     nodes = manifest.get("nodes", {})
-    cross_refs = {}
+    parent_refs: Dict[str, List[str]] = {}
+    node_refs: Dict[str, List[str]] = {}
 
-    for node_id, node in nodes.items():
-        depends_on = node.get("depends_on", {}).get("nodes", [])
-        upstream_deps = [
-            dep for dep in depends_on
-            if (dep.startswith(f"model.{upstream_project}.") or
-                f".{upstream_project}." in dep and dep.startswith("source."))
-        ]
+    # Bind hot-loop callables to locals; filter() applies the C-level regex
+    # match without a Python-level loop per ref
+    is_upstream = upstream_ref_pattern(upstream_project).match
+    get_node = nodes.get
 
+    # parent_map covers every node (plus sources/exposures), so walk it once
+    # and pick up each node's depends_on alongside its parents
+    for node_id, parents in parent_map.items():
+        upstream_parents = list(filter(is_upstream, parents))
+        if upstream_parents:
+            parent_refs[node_id] = upstream_parents
+
+        node = get_node(node_id)
+        if node is not None:
+            upstream_deps = list(filter(is_upstream, node.get("depends_on", {}).get("nodes", ())))
+            if upstream_deps:
+                node_refs[node_id] = upstream_deps
+
+    # Nodes missing from parent_map (only in partial/hand-edited manifests)
+    for node_id, node in nodes.items():
+        if node_id in parent_map:
+            continue
+        upstream_deps = list(filter(is_upstream, node.get("depends_on", {}).get("nodes", ())))
         if upstream_deps:
-            cross_refs[node_id] = upstream_deps
+            node_refs[node_id] = upstream_deps
 
-    return cross_refs
+    return parent_refs, node_refs
 
 
 def validate_lineage(manifest_path: Path, upstream_project: str = "dbt_up") -> Tuple[bool, str]:
@@ -93,7 +124,16 @@ def validate_lineage(manifest_path: Path, upstream_project: str = "dbt_up") -> T
 
     Returns (success: bool, message: str)
     """
-    manifest = load_manifest(manifest_path)
+    manifest = load_manifest(manifest_path, upstream_project)
+    if manifest is None:
+        print(f"Manifest path: {manifest_path}")
+        print(f"Looking for references to: {upstream_project}")
+        print("-" * 60)
+        print(f"\n✗ '{upstream_project}' does not appear anywhere in the manifest file (not parsed)")
+        return False, (
+            f"'{upstream_project}' not found in raw manifest bytes - "
+            "no cross-project references, or not a valid dbt manifest"
+        )
 
     # Get project name from manifest
     project_name = manifest.get("metadata", {}).get("project_name", "unknown")
@@ -103,14 +143,14 @@ def validate_lineage(manifest_path: Path, upstream_project: str = "dbt_up") -> T
     print(f"Looking for references to: {upstream_project}")
     print("-" * 60)
 
-    # Check parent_map
-    parent_refs = find_cross_project_refs(manifest, upstream_project)
+    # Check parent_map and nodes depends_on (fallback/additional check) in one pass
+    parent_refs, node_refs = find_cross_project_refs(manifest, upstream_project)
 
-    # Check nodes depends_on (fallback/additional check)
-    node_refs = find_cross_project_refs_in_nodes(manifest, upstream_project)
-
-    # Combine findings
-    all_refs = {**parent_refs, **node_refs}
+    # Combine findings, keeping refs from both sources for nodes present in each
+    all_refs = {
+        node_id: list(dict.fromkeys(chain(parent_refs.get(node_id, ()), node_refs.get(node_id, ()))))
+        for node_id in chain(parent_refs, (n for n in node_refs if n not in parent_refs))
+    }
 
     if not all_refs:
         return False, f"No cross-project references to '{upstream_project}' found in manifest"
@@ -118,12 +158,15 @@ def validate_lineage(manifest_path: Path, upstream_project: str = "dbt_up") -> T
     # Report findings
     print(f"\n✓ Found {len(all_refs)} model(s) with cross-project references:\n")
 
+    # Build the report in one buffer and write it once instead of a print per ref
+    lines = []
     for node_id, upstream_parents in all_refs.items():
-        node_name = node_id.split(".")[-1]
-        print(f"  {node_name}:")
+        node_name = node_id.rpartition(".")[2]
+        lines.append(f"  {node_name}:")
         for parent in upstream_parents:
-            parent_name = parent.split(".")[-1]
-            print(f"    └── {parent} (upstream: {parent_name})")
+            parent_name = parent.rpartition(".")[2]
+            lines.append(f"    └── {parent} (upstream: {parent_name})")
+    sys.stdout.write("\n".join(lines) + "\n")
 
     # Verify parent_map specifically (this is the key lineage indicator)
     if parent_refs:
@@ -134,6 +177,25 @@ def validate_lineage(manifest_path: Path, upstream_project: str = "dbt_up") -> T
         return True, "Partial lineage found (depends_on only)"
 
 
+def _validate_one(manifest_path: Path, upstream_project: str) -> Tuple[bool, str, str]:
+    """
+    Run validate_lineage with its report captured, so parallel runs don't interleave.
+
+    Returns (success: bool, message: str, output: str)
+    """
+    output = io.StringIO()
+    with redirect_stdout(output):
+        try:
+            success, message = validate_lineage(manifest_path, upstream_project)
+        except FileNotFoundError as e:
+            print(f"✗ {e}")
+            success, message = False, str(e)
+        except Exception as e:
+            print(f"✗ Error validating {manifest_path}: {e}")
+            success, message = False, str(e)
+    return success, message, output.getvalue()
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="Validate dbt mesh cross-project lineage"
@@ -183,24 +245,22 @@ def main():
         print("  python validate_lineage.py --manifest path/to/manifest.json")
         sys.exit(1)
 
-    # Validate each manifest
+    # Validate each manifest (in parallel across processes when there are several)
     all_passed = True
     results = []
+    upstreams = [args.upstream] * len(manifests_to_check)
+
+    if len(manifests_to_check) > 1:
+        with ProcessPoolExecutor(max_workers=len(manifests_to_check)) as executor:
+            outcomes = list(executor.map(_validate_one, manifests_to_check, upstreams))
+    else:
+        outcomes = list(map(_validate_one, manifests_to_check, upstreams))
 
-    for manifest_path in manifests_to_check:
+    for manifest_path, (success, message, output) in zip(manifests_to_check, outcomes):
         print("\n" + "=" * 60)
-        try:
-            success, message = validate_lineage(manifest_path, args.upstream)
-            results.append((manifest_path, success, message))
-            if not success:
-                all_passed = False
-        except FileNotFoundError as e:
-            print(f"✗ {e}")
-            results.append((manifest_path, False, str(e)))
-            all_passed = False
-        except Exception as e:
-            print(f"✗ Error validating {manifest_path}: {e}")
-            results.append((manifest_path, False, str(e)))
+        print(output, end="")
+        results.append((manifest_path, success, message))
+        if not success:
             all_passed = False
 
     # Summary